@@ -1,14 +1,39 @@
-from mcp.server.fastmcp import FastMCP
+import itertools
+import os
+from collections import Counter
 from typing import List, Union
 
-server = FastMCP(
+from order_store import ORDER_STATUSES, OrderStore, parse_ship_date
+from payloads import MAX_PAGE_SIZE, paginate, parse_fields, project
+from petstore_server import PetstoreServer
+from rate_limit import Limit, RateLimiter
+from record_store import VersionConflict, VersionedStore
+
+server = PetstoreServer(
     name="Petstore MCP Server",
-    instructions="Tools that mirror Swagger Petstore operations (stubbed for now)."
+    instructions="Tools that mirror Swagger Petstore operations (stubbed for now).",
+    rate_limiter=RateLimiter(
+        session_limit=Limit(rate=20, burst=40),
+        # per session, keyed by operationId
+        operation_limits={
+            "findPetsByTags": Limit(rate=5, burst=10),
+            "createUsersWithListInput": Limit(rate=2, burst=5),
+        },
+        max_in_flight=4,
+        max_queued=16
+    ),
+    # profiling tools are refused unless this is set
+    admin_token=os.environ.get("PETSTORE_ADMIN_TOKEN")
 )
 
+orders = OrderStore()
+pet_store = VersionedStore()
+user_store = VersionedStore()
+pet_ids = itertools.count(1)
+
 
 @server.tool()
-async def update_Pet(pet: dict) -> dict:
+async def update_Pet(pet: dict, echo: bool = True, expectedVersion: int = None) -> dict:
     """
     Update an existing pet by Id.
     Path: PUT /pet, operationId: updatePet
@@ -16,9 +41,12 @@ async def update_Pet(pet: dict) -> dict:
     Parameters:
       pet (dict): Pet object (must include 'id', 'name', 'photoUrls').
                   Optional fields per spec: 'category', 'tags', 'status'
+      echo (bool, optional): Set to False to leave the pet payload out of the response.
+      expectedVersion (int, optional): Only update if the pet is still at this version;
+                                       a stale version is refused with status 409.
 
     Returns:
-      dict: Stubbed successful response echoing the pet payload.
+      dict: Successful response with the pet's new version, echoing the pet payload.
     """
     # minimal validation to match the spec's required fields
     required = ["id", "name", "photoUrls"]
@@ -26,22 +54,36 @@ async def update_Pet(pet: dict) -> dict:
     if missing:
         return {"error": f"Missing required fields: {', '.join(missing)}"}
 
-    return {
+    if pet["id"] not in pet_store:
+        return {"error": f"Pet with ID {pet['id']} not found", "status": 404}
+
+    try:
+        version = pet_store.put(pet["id"], pet, expectedVersion)
+    except VersionConflict as e:
+        return {"error": str(e), "status": 409}
+
+    response = {
         "status": 200,
         "operationId": "updatePet",
         "method": "PUT",
         "path": "/pet",
         "contentType": "application/json",
-        "pet": pet
+        "version": version
     }
+    if echo:
+        response["pet"] = pet
+    return response
 
 
 @server.tool()
-async def add_Pet(pet: dict) -> dict:
+async def add_Pet(pet: dict, echo: bool = True) -> dict:
     """
     Add a new pet to the store.
     Parameters:
         pet (dict): Pet object containing at least 'name' and 'photoUrls'.
+                    An 'id' is assigned if none is given; an id already in use is
+                    refused with status 409.
+        echo (bool, optional): Set to False to leave the pet payload out of the response.
     """
     required_fields = ["name", "photoUrls"]
     missing_fields = [f for f in required_fields if f not in pet]
@@ -52,17 +94,43 @@ async def add_Pet(pet: dict) -> dict:
             "status": 400
         }
 
-    return {
+    if "id" not in pet:
+        pet_id = next(pet_ids)
+        while pet_id in pet_store:
+            pet_id = next(pet_ids)
+        pet = {"id": pet_id, **pet}
+
+    try:
+        version = pet_store.put(pet["id"], pet, expected_version=0)
+    except VersionConflict:
+        return {"error": f"Pet with ID {pet['id']} already exists", "status": 409}
+
+    response = {
         "message": "Pet added successfully",
-        "pet": pet,
-        "status": 200
+        "status": 200,
+        "version": version
     }
+    if echo:
+        response["pet"] = pet
+    return response
 
 
 @server.tool()
-async def find_Pet_By_Status(status: str = "available")-> dict:
+async def find_Pet_By_Status(
+        status: str = "available",
+        fields: Union[str, List[str], None] = None,
+        limit: int = 50,
+        cursor: str = None
+) -> dict:
     """
     Finds pets by status. Allowed: available, pending, sold.
+
+    Parameters:
+        status (str, optional): Pet status to filter by. Defaults to 'available'.
+        fields (str | list, optional): Only return these Pet keys, as a comma-separated
+                                       string or a list, e.g. 'id,name'.
+        limit (int, optional): Page size, 1 to MAX_PAGE_SIZE (500). Defaults to 50.
+        cursor (str, optional): 'nextCursor' from the previous page; omit for the first page.
     """
     allowed_status = ["available", "pending", "sold"]
 
@@ -78,18 +146,36 @@ async def find_Pet_By_Status(status: str = "available")-> dict:
         {"id": 3, "name": "Birdy", "status": "sold"},
     ]
     filtered_pets = [p for p in pets if p["status"] == status]
+    try:
+        page, next_cursor = paginate(filtered_pets, limit, cursor)
+    except ValueError as e:
+        return {"error": str(e), "status": 400}
+
     return {
         "message": f"Found {len(filtered_pets)} pets with status '{status}'.",
-        "pets": filtered_pets,
+        "pets": project(page, parse_fields(fields)),
+        "nextCursor": next_cursor,
         "status": 200
     }
 
 
 @server.tool()
-async def find_pets_by_tags(tags: Union[str, List[str], None] =  None) -> dict:
+async def find_pets_by_tags(
+        tags: Union[str, List[str], None] =  None,
+        fields: Union[str, List[str], None] = None,
+        limit: int = 50,
+        cursor: str = None,
+        echo: bool = True
+) -> dict:
     """
         Find pets by tags (OpenAPI: /pet/findByTags GET).
-        'tags' can be a comma-separated string or a list of strings.
+
+        Parameters:
+            tags (str | list): Tags to filter by, as a comma-separated string or a list of strings.
+            fields (str | list, optional): Only return these Pet keys, in the same format as 'tags'.
+            limit (int, optional): Page size, 1 to MAX_PAGE_SIZE (500). Defaults to 50.
+            cursor (str, optional): 'nextCursor' from the previous page; omit for the first page.
+            echo (bool, optional): Set to False to leave the request tags out of the response.
         """
     try:
         if tags is None or (isinstance(tags, str) and not tags.strip()):
@@ -100,14 +186,21 @@ async def find_pets_by_tags(tags: Union[str, List[str], None] =  None) -> dict:
         else:
             tag_list = [str(t).strip() for t in tags if str(t).strip()]
 
-        return {
-            "operationId": "findPetsByTags",
-            "request": {"tags": tag_list},
-            "result": [
-                {"id": 101, "name": "doggie", "tags": tag_list[:1] or ["tag1"]},
-                {"id": 202, "name": "mittens", "tags": tag_list[:1] or ["tag1"]},
-            ],
-        }
+        pets = [
+            {"id": 101, "name": "doggie", "tags": tag_list[:1] or ["tag1"]},
+            {"id": 202, "name": "mittens", "tags": tag_list[:1] or ["tag1"]},
+        ]
+        try:
+            page, next_cursor = paginate(pets, limit, cursor)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        response = {"operationId": "findPetsByTags"}
+        if echo:
+            response["request"] = {"tags": tag_list}
+        response["result"] = project(page, parse_fields(fields))
+        response["nextCursor"] = next_cursor
+        return response
 
     except Exception as e:
         return {"error": str(e)}
@@ -124,17 +217,20 @@ async def get_pet_by_id(petId: int) -> dict:
         petId (path) - integer, required: ID of pet to return
     """
     try:
-        # Simulated responses based on spec
         if petId <= 0:
             return {"code": 400, "description": "Invalid ID supplied"}
-        elif petId == 9999:
+
+        pet, version = pet_store.get(petId)
+        if pet is None:
             return {"code": 404, "description": "Pet not found"}
-        else:
-            return {
-                "code": 200,
-                "description": f"Pet data for ID {petId}",
-                "content_types": ["application/json", "application/xml"]
-            }
+
+        return {
+            "code": 200,
+            "description": f"Pet data for ID {petId}",
+            "pet": pet,
+            "version": version,
+            "content_types": ["application/json", "application/xml"]
+        }
     except Exception as e:
         return {
             "code": "default",
@@ -144,7 +240,12 @@ async def get_pet_by_id(petId: int) -> dict:
 
 
 @server.tool()
-async def update_pet_with_form(petId: int, name: str = None, status: str = None) -> dict:
+async def update_pet_with_form(
+        petId: int,
+        name: str = None,
+        status: str = None,
+        expectedVersion: int = None
+) -> dict:
     """
     Update a pet resource based on form data.
     Path: POST /pet/{petId}
@@ -153,16 +254,17 @@ async def update_pet_with_form(petId: int, name: str = None, status: str = None)
         petId (int, required): ID of the pet to be updated.
         name (str, optional): New name for the pet.
         status (str, optional): New status for the pet.
+        expectedVersion (int, optional): Only update if the pet is still at this version;
+                                         a stale version is refused with code 409.
 
     Returns:
-        dict: Simulated response indicating the update result.
+        dict: Response indicating the update result and the pet's new version.
     """
     try:
         # Validate required path parameter
         if petId <= 0:
             return {"code": 400, "description": "Invalid ID supplied"}
 
-        # Stubbed logic: just echo back what was sent
         update_fields = {}
         if name:
             update_fields["name"] = name
@@ -175,12 +277,19 @@ async def update_pet_with_form(petId: int, name: str = None, status: str = None)
                 "description": "No update fields provided (name or status required)."
             }
 
+        pet, version = pet_store.update(petId, update_fields, expectedVersion)
+        if pet is None:
+            return {"code": 404, "description": "Pet not found"}
+
         return {
             "code": 200,
             "description": f"Pet {petId} updated successfully.",
             "updated_fields": update_fields,
+            "version": version,
             "content_types": ["application/json", "application/xml"]
         }
+    except VersionConflict as e:
+        return {"code": 409, "description": str(e)}
     except Exception as e:
         return {
             "code": "default",
@@ -190,16 +299,18 @@ async def update_pet_with_form(petId: int, name: str = None, status: str = None)
 
 
 @server.tool()
-async def deletePet(petId: int) -> dict:
+async def deletePet(petId: int, expectedVersion: int = None) -> dict:
     """
     Deletes a pet by ID.
     Path: DELETE /pet/{petId}, operationId: deletePet
 
     Parameters:
         petId (int): ID of the pet to delete.
+        expectedVersion (int, optional): Only delete if the pet is still at this version;
+                                         a stale version is refused with status 409.
 
     Returns:
-        dict: Stubbed response confirming deletion or error.
+        dict: Response confirming deletion or error.
     """
     try:
         if petId <= 0:
@@ -207,16 +318,19 @@ async def deletePet(petId: int) -> dict:
                 "status": 400,
                 "message": "Invalid ID supplied"
             }
-        elif petId == 9999:
+
+        if pet_store.delete(petId, expectedVersion) is None:
             return {
                 "status": 404,
                 "message": f"Pet with ID {petId} not found"
             }
-        else:
-            return {
-                "status": 200,
-                "message": f"Pet with ID {petId} deleted successfully"
-            }
+
+        return {
+            "status": 200,
+            "message": f"Pet with ID {petId} deleted successfully"
+        }
+    except VersionConflict as e:
+        return {"status": 409, "message": str(e)}
     except Exception as e:
         return {
             "status": 500,
@@ -298,7 +412,7 @@ async def getInventory() -> dict:
         }
 
 @server.tool()
-async def placeOrder(order: dict)-> dict:
+async def placeOrder(order: dict, echo: bool = True)-> dict:
     """
         Place a new order in the store.
         Path: POST /store/order
@@ -309,10 +423,12 @@ async def placeOrder(order: dict)-> dict:
 
         Parameters:
             order (dict): Order object containing at least 'id', 'petId', and 'quantity'.
-                          Optional fields: 'shipDate', 'status', 'complete'
+                          Optional fields: 'shipDate' (defaults to now), 'status'
+                          (placed, approved or delivered; defaults to placed), 'complete'
+            echo (bool, optional): Set to False to return only the order id instead of the stored order.
 
         Returns:
-            dict: Stubbed response echoing the order payload with status code.
+            dict: The stored order with status code.
         """
     required_fields = ["id", "petId", "quantity"]
     missing_fields = [f for f in required_fields if f not in order]
@@ -323,12 +439,21 @@ async def placeOrder(order: dict)-> dict:
         "status": 400
         }
 
-    return {
+    try:
+        stored = orders.put(order)
+    except ValueError as e:
+        return {"error": str(e), "status": 422}
+
+    response = {
         "status": 200,
         "message": "Order placed successfully",
-        "order": order,
         "content_type": "application/json"
     }
+    if echo:
+        response["order"] = stored
+    else:
+        response["orderId"] = stored["id"]
+    return response
 
 
 @server.tool()
@@ -339,33 +464,28 @@ async def get_order_by_Id(orderId: int) -> dict:
         OperationId: getOrderById
 
         Description:
-            For valid response try integer IDs with value <= 5 or > 10.
-            Other values will generate exceptions.
+            Returns an order previously placed with placeOrder.
 
         Parameters:
             orderId (int): ID of order that needs to be fetched (required).
 
         Returns:
-            dict: Stubbed response containing order details or error message.
+            dict: Response containing order details or error message.
         """
     try:
         if orderId <= 0:
             return {"code": 400, "description": "Invalid ID supplied"}
-        elif 6 <= orderId <= 10:
+
+        order = orders.get(orderId)
+        if order is None:
             return {"code": 404, "description": "Order not found"}
-        else:
-            return {
-                "code": 200,
-                "description": f"Order data for ID {orderId}",
-                "order": {
-                    "id": orderId,
-                    "petId": 123,
-                    "quantity": 2,
-                    "status": "approved",
-                    "complete": False
-                },
-                "content_types": ["application/json", "application/xml"]
-            }
+
+        return {
+            "code": 200,
+            "description": f"Order data for ID {orderId}",
+            "order": order,
+            "content_types": ["application/json", "application/xml"]
+        }
     except Exception as e:
         return {
             "code": "default",
@@ -382,26 +502,26 @@ async def deleteOrder(orderId: int) -> dict:
         OperationId: deleteOrder
 
         Description:
-            For valid response try integer IDs with value < 1000.
-            Anything above 1000 or non-integers will generate API errors.
+            Removes an order previously placed with placeOrder.
 
         Parameters:
             orderId (int): ID of the order that needs to be deleted (required).
 
         Returns:
-            dict: Stubbed response confirming deletion or error message.
+            dict: Response confirming deletion or error message.
         """
     try:
         if orderId <= 0:
             return {"code": 400, "description": "Invalid ID supplied"}
-        elif orderId > 1000:
+
+        if orders.delete(orderId) is None:
             return {"code": 404, "description": f"Order {orderId} not found"}
-        else:
-            return {
-                "code": 200,
-                "description": f"Order {orderId} deleted successfully",
-                "status": "deleted"
-            }
+
+        return {
+            "code": 200,
+            "description": f"Order {orderId} deleted successfully",
+            "status": "deleted"
+        }
 
     except Exception as e:
         return {
@@ -412,7 +532,66 @@ async def deleteOrder(orderId: int) -> dict:
 
 
 @server.tool()
-async def createUser(user: dict) -> dict:
+async def list_orders_by_ship_date(
+        start: str = None,
+        end: str = None,
+        status: str = None,
+        limit: int = 50,
+        cursor: str = None,
+        fields: Union[str, List[str], None] = None
+) -> dict:
+    """
+        List orders whose shipDate falls in a time window, oldest first.
+        Not a Petstore endpoint; reads the same order store as getOrderById.
+
+        Parameters:
+            start (str, optional): Inclusive lower bound, RFC 3339 date-time.
+            end (str, optional): Exclusive upper bound, RFC 3339 date-time.
+            status (str, optional): Only orders with this status (placed, approved, delivered).
+            limit (int, optional): Page size, 1 to MAX_PAGE_SIZE. Defaults to 50.
+            cursor (str, optional): 'nextCursor' from the previous page.
+            fields (str | list, optional): Only return these Order keys, e.g. 'id,shipDate'.
+
+        Returns:
+            dict: A page of orders, the total in the window, per-status counts
+                  for the same window and the cursor for the next page.
+        """
+    if status is not None and status not in ORDER_STATUSES:
+        return {
+            "error": f"Invalid status '{status}'. Must be one of {ORDER_STATUSES}.",
+            "status": 400
+        }
+
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return {"error": f"limit must be between 1 and {MAX_PAGE_SIZE}", "status": 400}
+
+    try:
+        start_dt = parse_ship_date(start) if start else None
+        end_dt = parse_ship_date(end) if end else None
+    except ValueError as e:
+        return {"error": f"Invalid date-time: {e}", "status": 400}
+
+    after = None
+    if cursor:
+        try:
+            ts, order_id = cursor.split(":")
+            after = (float(ts), int(order_id))
+        except ValueError:
+            return {"error": f"Invalid cursor '{cursor}'", "status": 400}
+
+    page, total, next_key = orders.range(start_dt, end_dt, status, after, limit)
+    return {
+        "status": 200,
+        "message": f"Found {total} orders in the requested window.",
+        "orders": project(page, parse_fields(fields)),
+        "total": total,
+        "counts": orders.count_by_status(start_dt, end_dt),
+        "nextCursor": f"{next_key[0]!r}:{next_key[1]}" if next_key else None
+    }
+
+
+@server.tool()
+async def createUser(user: dict, echo: bool = True) -> dict:
     """
         Create a new user.
         Path: POST /user
@@ -424,9 +603,11 @@ async def createUser(user: dict) -> dict:
         Parameters:
             user (dict): User object containing at least 'id', 'username', and 'password'.
                          Optional fields: 'firstName', 'lastName', 'email', 'phone', 'userStatus'
+            echo (bool, optional): Set to False to leave the user payload out of the response.
 
         Returns:
-            dict: Stubbed response echoing the created user with status code.
+            dict: Response echoing the created user, with its version and status code.
+                  A username already in use is refused with status 409.
         """
     required_fields = ["id", "username", "password"]
     missing_fields = [f for f in required_fields if f not in user]
@@ -437,16 +618,28 @@ async def createUser(user: dict) -> dict:
             "status": 400
         }
 
-    return {
+    try:
+        version = user_store.put(user["username"], user, expected_version=0)
+    except VersionConflict:
+        return {"error": f"User '{user['username']}' already exists", "status": 409}
+
+    response = {
         "status": 200,
         "message": "User created successfully",
-        "user": user,
+        "version": version,
         "content_types": ["application/json", "application/xml"]
     }
+    if echo:
+        response["user"] = user
+    return response
 
 
 @server.tool()
-async def create_users_with_list_input(users: list) -> dict:
+async def create_users_with_list_input(
+        users: list,
+        fields: Union[str, List[str], None] = None,
+        echo: bool = True
+) -> dict:
     """
         Creates list of users with given input array.
         Path: POST /user/createWithList
@@ -460,9 +653,13 @@ async def create_users_with_list_input(users: list) -> dict:
                           'id', 'username', and 'password'.
                           Optional fields: 'firstName', 'lastName', 'email',
                           'phone', 'userStatus'
+            fields (str | list, optional): Only echo these keys of each user, e.g. 'id,username'.
+            echo (bool, optional): Set to False to leave the users out of the response.
 
         Returns:
-            dict: Stubbed response echoing the list of created users.
+            dict: Response echoing the list of created users. If any username is
+                  already in use (or repeated in the list), no user is created and
+                  status 409 is returned.
         """
     if not users or not isinstance(users, list):
         return {"error": "Users list is required", "status": 400}
@@ -479,12 +676,23 @@ async def create_users_with_list_input(users: list) -> dict:
             "status": 400
         }
 
-    return {
+    # all or nothing: refuse the whole list if any username is taken or repeated
+    usernames = Counter(u["username"] for u in users)
+    taken = sorted(str(name) for name, n in usernames.items() if n > 1 or name in user_store)
+    if taken:
+        return {"error": f"Users already exist: {', '.join(taken)}", "status": 409}
+
+    for u in users:
+        user_store.put(u["username"], u, expected_version=0)
+
+    response = {
         "status": 200,
         "message": f"{len(users)} users created successfully",
-        "users": users,
         "content_types": ["application/json", "application/xml"]
     }
+    if echo:
+        response["users"] = project(users, parse_fields(fields))
+    return response
 
 
 @server.tool()
@@ -570,28 +778,23 @@ async def get_user_by_name(username: str) ->dict:
             username (str): The name of the user to be fetched (required).
 
         Returns:
-            dict: Stubbed response with user details or error message.
+            dict: Response with user details and version, or error message.
         """
     try:
         if not username or username.strip() == "":
             return {"code": 400, "description": "Invalid username supplied"}
-        elif username == "unknown":
+
+        user, version = user_store.get(username)
+        if user is None:
             return {"code": 404, "description": f"User '{username}' not found"}
-        else:
-            return {
-                "code": 200,
-                "description": f"User data for {username}",
-                "user": {
-                    "id": 1,
-                    "username": username,
-                    "firstName": "John",
-                    "lastName": "Doe",
-                    "email": f"{username}@example.com",
-                    "phone": "123-456-7890",
-                    "userStatus": 1
-                },
-                "content_types": ["application/json", "application/xml"]
-            }
+
+        return {
+            "code": 200,
+            "description": f"User data for {username}",
+            "user": user,
+            "version": version,
+            "content_types": ["application/json", "application/xml"]
+        }
 
     except Exception as e:
         return {
@@ -601,7 +804,12 @@ async def get_user_by_name(username: str) ->dict:
         }
 
 @server.tool()
-async def updateUser(username: str, user: dict) -> dict:
+async def updateUser(
+        username: str,
+        user: dict,
+        echo: bool = True,
+        expectedVersion: int = None
+) -> dict:
     """
         Update user resource.
         Path: PUT /user/{username}
@@ -615,27 +823,40 @@ async def updateUser(username: str, user: dict) -> dict:
             user (dict):    User object payload to update the resource with.
                             Optional fields per spec: id, firstName, lastName, email,
                             password, phone, userStatus, etc.
+                            Fields not given keep their current values.
+            echo (bool, optional): Set to False to leave the user payload out of the response.
+            expectedVersion (int, optional): Only update if the user is still at this version;
+                                             a stale version is refused with code 409.
 
         Returns:
-            dict: Stubbed response indicating update result or error.
+            dict: Response indicating update result and the user's new version, or error.
         """
     try:
         if not username or username.strip == "":
             return {"code": 400, "description": "Invalid username supplied"}
 
-        if username == "unknown":
-            return {"code": 404, "description": f"User '{username}' not found"}
-
         if not isinstance(user, dict) or len(user) == 0:
             return {"code": 400, "description": "Request body is required with at least one field"}
 
-        # Stubbed success response (echo the payload)
-        return {
+        if user.get("username", username) != username:
+            return {"code": 400, "description": "Changing the username is not supported"}
+
+        updated, version = user_store.update(username, user, expectedVersion)
+        if updated is None:
+            return {"code": 404, "description": f"User '{username}' not found"}
+
+        response = {
             "code": 200,
             "description": f"User '{username}' updated successfully",
             "username": username,
-            "updated_user": user
+            "version": version
         }
+        if echo:
+            response["updated_user"] = user
+        return response
+
+    except VersionConflict as e:
+        return {"code": 409, "description": str(e)}
 
     except Exception as e:
         return {
@@ -646,7 +867,7 @@ async def updateUser(username: str, user: dict) -> dict:
 
 
 @server.tool()
-async def deleteUser(username: str) -> dict:
+async def deleteUser(username: str, expectedVersion: int = None) -> dict:
     """
         Delete user resource.
         Path: DELETE /user/{username}
@@ -657,15 +878,17 @@ async def deleteUser(username: str) -> dict:
 
         Parameters:
             username (str): The username (path parameter) of the user to delete. (required)
+            expectedVersion (int, optional): Only delete if the user is still at this version;
+                                             a stale version is refused with code 409.
 
         Returns:
-            dict: Stubbed response confirming deletion or error.
+            dict: Response confirming deletion or error.
         """
     try:
         if not username or username.strip() == "":
             return {"code": 400, "description": "Invalid username supplied"}
 
-        if username == "unknown":
+        if user_store.delete(username, expectedVersion) is None:
             return {"code": 404, "description": f"User '{username}' not found"}
 
         return {
@@ -674,6 +897,9 @@ async def deleteUser(username: str) -> dict:
             "status": "deleted"
         }
 
+    except VersionConflict as e:
+        return {"code": 409, "description": str(e)}
+
     except Exception as e:
         return {
             "code": "default",
@@ -682,6 +908,99 @@ async def deleteUser(username: str) -> dict:
         }
 
 
+@server.tool()
+async def get_rate_limit_stats() -> dict:
+    """
+        Rate limiting and queue-depth metrics for the server.
+        Not a Petstore endpoint.
+
+        Returns:
+            dict: Configured limits, total calls running and queued, and per-client
+                  counters (calls, rejected, inFlight, queued).
+        """
+    return {
+        "code": 200,
+        "description": "Rate limit statistics",
+        "stats": server.rate_limiter.stats()
+    }
+
+
+@server.tool()
+async def start_profiler(
+        adminToken: str,
+        seconds: float = 30,
+        intervalMs: float = 5,
+        trackAllocations: bool = False
+) -> dict:
+    """
+        Start a sampling profile of the server. Admin only.
+        Not a Petstore endpoint.
+
+        Parameters:
+            adminToken (str): Must match PETSTORE_ADMIN_TOKEN on the server.
+            seconds (float, optional): How long to sample, 1-600. Defaults to 30.
+            intervalMs (float, optional): Sampling interval in milliseconds, 1-1000. Defaults to 5.
+            trackAllocations (bool, optional): Also collect tracemalloc statistics per operationId.
+
+        Returns:
+            dict: Path of the collapsed-stack file that will be written when the profile ends.
+        """
+    if not server.is_admin(adminToken):
+        return {"code": 403, "description": "Admin token required"}
+
+    if not 1 <= seconds <= 600 or not 1 <= intervalMs <= 1000:
+        return {"code": 400, "description": "seconds must be 1-600 and intervalMs 1-1000"}
+
+    try:
+        output = server.profiler.start(seconds, intervalMs / 1000, trackAllocations)
+    except RuntimeError as e:
+        return {"code": 409, "description": str(e)}
+
+    return {
+        "code": 200,
+        "description": f"Profiling for {seconds:g}s",
+        "output": output,
+        "trackAllocations": trackAllocations
+    }
+
+
+@server.tool()
+async def stop_profiler(adminToken: str) -> dict:
+    """
+        Stop the running profile early, or fetch the report of the last one. Admin only.
+        Not a Petstore endpoint.
+
+        Parameters:
+            adminToken (str): Must match PETSTORE_ADMIN_TOKEN on the server.
+
+        Returns:
+            dict: Output file, sample counts and, if tracked, allocations per operationId
+                  and the top allocation sites.
+        """
+    if not server.is_admin(adminToken):
+        return {"code": 403, "description": "Admin token required"}
+
+    report = await server.profiler.stop()
+    if report is None:
+        return {"code": 404, "description": "No profile has been run"}
+
+    return {"code": 200, "description": "Profile report", "report": report}
+
+
 if __name__ == "__main__":
     print("Starting MCP server...")
-    server.run(transport="sse")
+    if not server.load_catalog():
+        print("Serving tool schemas derived from main.py")
+
+    record_log = os.environ.get("PETSTORE_RECORD_LOG")
+    if record_log:
+        from traffic import TrafficRecorder
+
+        server.recorder = TrafficRecorder(record_log)
+        print(f"Recording tool calls to {record_log}")
+
+    try:
+        server.run(transport="sse")
+    finally:
+        if server.recorder is not None:
+            server.recorder.close()
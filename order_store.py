@@ -0,0 +1,257 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timezone
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+
+# Order.status enum from components/schemas/Order in specs/petstore.yaml
+ORDER_STATUSES = ["placed", "approved", "delivered"]
+
+
+def parse_ship_date(value: str) -> datetime:
+    """
+    Parse an OpenAPI date-time string (RFC 3339) into an aware UTC datetime.
+
+    Naive values are treated as UTC so they sort alongside aware ones.
+    Raises ValueError if the value cannot be parsed.
+    """
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("shipDate must be a non-empty date-time string")
+
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def format_ship_date(value: datetime) -> str:
+    """Format a UTC datetime the way the Petstore API returns shipDate."""
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}Z"
+
+
+class SortedKeys:
+    """
+    Sorted list of (timestamp, id) keys stored as a list of bounded chunks.
+
+    A flat list needs an O(n) memmove for every insort, which dominates once
+    there are millions of orders. Chunking keeps each insert/remove to a
+    bisect over the chunk maxima plus a shift inside one small chunk.
+    """
+
+    CHUNK = 1024
+
+    def __init__(self):
+        self._chunks: List[List[Tuple[float, int]]] = []
+        self._maxes: List[Tuple[float, int]] = []
+        self._offsets: Optional[List[int]] = None
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key: Tuple[float, int]) -> None:
+        self._offsets = None
+        self._len += 1
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            return
+
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+            self._chunks[i].append(key)
+            self._maxes[i] = key
+        else:
+            insort(self._chunks[i], key)
+
+        chunk = self._chunks[i]
+        if len(chunk) > 2 * self.CHUNK:
+            self._chunks[i:i + 1] = [chunk[:self.CHUNK], chunk[self.CHUNK:]]
+            self._maxes[i:i + 1] = [chunk[self.CHUNK - 1], chunk[-1]]
+
+    def remove(self, key: Tuple[float, int]) -> bool:
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return False
+        chunk = self._chunks[i]
+        j = bisect_left(chunk, key)
+        if chunk[j] != key:
+            return False
+
+        self._offsets = None
+        self._len -= 1
+        del chunk[j]
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+        return True
+
+    def bisect_left(self, key: tuple) -> int:
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return self._len
+        return self._position(i) + bisect_left(self._chunks[i], key)
+
+    def bisect_right(self, key: tuple) -> int:
+        i = bisect_right(self._maxes, key)
+        if i == len(self._maxes):
+            return self._len
+        return self._position(i) + bisect_right(self._chunks[i], key)
+
+    def slice(self, lo: int, hi: int) -> List[Tuple[float, int]]:
+        """Keys at positions lo..hi-1."""
+        result = []
+        if lo >= hi:
+            return result
+        self._position(0)
+        i = bisect_right(self._offsets, lo) - 1
+        start = lo - self._offsets[i]
+        while i < len(self._chunks) and len(result) < hi - lo:
+            result.extend(self._chunks[i][start:start + hi - lo - len(result)])
+            i += 1
+            start = 0
+        return result
+
+    def _position(self, chunk_index: int) -> int:
+        # prefix sums of chunk lengths, rebuilt lazily after a write
+        if self._offsets is None:
+            self._offsets = [0, *accumulate(len(c) for c in self._chunks)]
+        return self._offsets[chunk_index]
+
+
+class OrderStore:
+    """
+    In-memory order repository for the /store/order tools.
+
+    Orders are kept in a dict keyed by id. Two secondary indexes are kept in
+    step with it:
+      - a SortedKeys of (shipDate timestamp, id) over every order, so a time
+        window is two bisects and a slice;
+      - one SortedKeys per Order.status, so a status filter or a per-status
+        count never has to scan the other statuses.
+
+    Every method is synchronous, so calls made from the async tools cannot
+    interleave on the event loop.
+    """
+
+    def __init__(self):
+        self._orders: Dict[int, dict] = {}
+        self._keys: Dict[int, Tuple[float, int]] = {}
+        self._by_ship_date = SortedKeys()
+        self._by_status: Dict[str, SortedKeys] = {s: SortedKeys() for s in ORDER_STATUSES}
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._orders
+
+    def get(self, order_id: int) -> Optional[dict]:
+        return self._orders.get(order_id)
+
+    def put(self, order: dict) -> dict:
+        """
+        Insert or replace an order.
+
+        Parameters:
+            order (dict): Order object with an integer 'id'. 'shipDate' defaults
+                          to now and 'status' defaults to 'placed'.
+
+        Returns:
+            dict: The stored order, with shipDate normalised to UTC.
+
+        Raises ValueError on an invalid id, shipDate or status.
+        """
+        order_id = order.get("id")
+        if not isinstance(order_id, int) or isinstance(order_id, bool):
+            raise ValueError("Order 'id' must be an integer")
+
+        status = order.get("status", "placed")
+        if status not in ORDER_STATUSES:
+            raise ValueError(f"Invalid status '{status}'. Must be one of {ORDER_STATUSES}.")
+
+        if order.get("shipDate") is None:
+            ship_date = datetime.now(timezone.utc)
+        else:
+            ship_date = parse_ship_date(order["shipDate"])
+        # index on the same millisecond precision clients see in shipDate
+        ship_date = ship_date.replace(microsecond=ship_date.microsecond // 1000 * 1000)
+
+        stored = dict(order)
+        stored["shipDate"] = format_ship_date(ship_date)
+        stored["status"] = status
+
+        if order_id in self._orders:
+            self._unindex(order_id)
+
+        key = (ship_date.timestamp(), order_id)
+        self._orders[order_id] = stored
+        self._keys[order_id] = key
+        self._by_ship_date.add(key)
+        self._by_status[status].add(key)
+        return stored
+
+    def delete(self, order_id: int) -> Optional[dict]:
+        """Remove an order; returns it, or None if it was not stored."""
+        if order_id not in self._orders:
+            return None
+        self._unindex(order_id)
+        del self._keys[order_id]
+        return self._orders.pop(order_id)
+
+    def count_by_status(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[str, int]:
+        """Orders per Order.status with start <= shipDate < end (open bounds if None)."""
+        counts = {}
+        for status, keys in self._by_status.items():
+            lo, hi = self._bounds(keys, start, end)
+            counts[status] = max(hi - lo, 0)
+        return counts
+
+    def range(
+            self,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+            status: Optional[str] = None,
+            after: Optional[Tuple[float, int]] = None,
+            limit: int = 50
+    ) -> Tuple[List[dict], int, Optional[Tuple[float, int]]]:
+        """
+        Orders with start <= shipDate < end, oldest first.
+
+        Parameters:
+            start (datetime, optional): Inclusive lower bound (open if None).
+            end (datetime, optional): Exclusive upper bound (open if None).
+            status (str, optional): Restrict to one Order.status.
+            after (tuple, optional): Index key of the last order of the previous page.
+            limit (int): Maximum number of orders to return.
+
+        Returns:
+            tuple: (orders, total matching the window, key of the last order
+                   returned or None when there are no more pages).
+        """
+        keys = self._by_ship_date if status is None else self._by_status[status]
+
+        lo, hi = self._bounds(keys, start, end)
+        total = max(hi - lo, 0)
+
+        if after is not None:
+            lo = max(lo, keys.bisect_right(after))
+
+        page = keys.slice(lo, min(lo + limit, hi))
+        orders = [self._orders[order_id] for _, order_id in page]
+        next_key = page[-1] if page and lo + limit < hi else None
+        return orders, total, next_key
+
+    @staticmethod
+    def _bounds(keys: SortedKeys, start: Optional[datetime], end: Optional[datetime]) -> Tuple[int, int]:
+        lo = 0 if start is None else keys.bisect_left((start.timestamp(),))
+        hi = len(keys) if end is None else keys.bisect_left((end.timestamp(),))
+        return lo, hi
+
+    def _unindex(self, order_id: int) -> None:
+        key = self._keys[order_id]
+        status = self._orders[order_id]["status"]
+        self._by_ship_date.remove(key)
+        self._by_status[status].remove(key)
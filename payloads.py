@@ -0,0 +1,54 @@
+from typing import List, Optional, Tuple, Union
+
+# Upper bound for the 'limit' argument of paginated tools
+MAX_PAGE_SIZE = 500
+
+
+def parse_fields(fields: Union[str, List[str], None]) -> Optional[List[str]]:
+    """
+    Normalise a 'fields' projection argument.
+    Accepts a comma-separated string or a list of strings, like 'tags' in findPetsByTags.
+    Returns None when no projection was requested.
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        names = [f.strip() for f in fields.split(",") if f.strip()]
+    else:
+        names = [str(f).strip() for f in fields if str(f).strip()]
+    return names or None
+
+
+def project(items: List[dict], fields: Optional[List[str]]) -> List[dict]:
+    """Keep only the requested keys of each item; unknown keys are skipped."""
+    if not fields:
+        return items
+    return [{k: item[k] for k in fields if k in item} for item in items]
+
+
+def paginate(items: list, limit: int, cursor: str = None) -> Tuple[list, Optional[str]]:
+    """
+    Slice one page out of an in-memory result list.
+
+    Parameters:
+        items (list): Full result list, in a stable order.
+        limit (int): Page size, 1 to MAX_PAGE_SIZE.
+        cursor (str, optional): 'nextCursor' returned with the previous page.
+
+    Returns:
+        tuple: (page, cursor for the next page or None on the last page).
+
+    Raises ValueError on a bad limit or cursor.
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    offset = 0
+    if cursor:
+        if not cursor.isdigit():
+            raise ValueError(f"Invalid cursor '{cursor}'")
+        offset = int(cursor)
+
+    page = items[offset:offset + limit]
+    next_cursor = str(offset + limit) if offset + limit < len(items) else None
+    return page, next_cursor
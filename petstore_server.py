@@ -0,0 +1,99 @@
+import hmac
+import json
+import os
+from functools import partial
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+from mcp.types import Tool
+
+from profiling import Profiler
+from rate_limit import RateLimited, RateLimiter
+from tool_catalog import CATALOG_PATH, TOOL_OPERATIONS, source_hash
+
+
+class PetstoreServer(FastMCP):
+    """
+    FastMCP server for the Petstore tools.
+
+    Adds on top of FastMCP:
+      - list_tools is answered from the prebuilt catalogue once load_catalog() succeeds;
+      - call_tool runs under 'rate_limiter' (if given), keyed by client session and operationId;
+      - every call except ADMIN_TOOLS is appended to the traffic log while 'recorder' is set;
+      - per-operationId allocations are tracked while 'profiler' tracks them.
+    """
+
+    # admin calls carry the admin token and must not end up in a log that gets replayed
+    ADMIN_TOOLS = frozenset({"start_profiler", "stop_profiler"})
+
+    def __init__(self, *args, rate_limiter: RateLimiter = None, admin_token: str = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.catalog = None
+        self.rate_limiter = rate_limiter
+        self.recorder = None
+        self.profiler = Profiler()
+        self.admin_token = admin_token
+
+    def is_admin(self, token: str) -> bool:
+        """True if 'token' matches the configured admin token; always False if none is configured."""
+        if not self.admin_token or not token:
+            return False
+        return hmac.compare_digest(token.encode(), self.admin_token.encode())
+
+    def load_catalog(self, path: str = CATALOG_PATH) -> bool:
+        """
+        Load the catalogue built by tool_catalog.py.
+
+        The catalogue is ignored, and list_tools falls back to FastMCP, if the
+        file is missing or was built from a different spec or different tool
+        signatures and docstrings than the ones registered now.
+
+        Returns:
+            bool: True if the catalogue is in use.
+        """
+        if not os.path.exists(path):
+            return False
+
+        with open(path, encoding="utf-8") as f:
+            catalog = json.load(f)
+
+        if catalog.get("sourceHash") != source_hash(self._tool_manager.list_tools()):
+            print(f"Tool catalogue {path} is out of date, run tool_catalog.py to rebuild it.")
+            return False
+
+        self.catalog = [Tool.model_validate(t) for t in catalog["tools"]]
+        return True
+
+    async def list_tools(self) -> list[Tool]:
+        if self.catalog is not None:
+            return self.catalog
+        return await super().list_tools()
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]):
+        operation_id = TOOL_OPERATIONS.get(name, (name, None))[0]
+        session = self.current_session()
+        call = partial(self._call_limited, session, name, operation_id, arguments)
+        if self.profiler.tracking_allocations:
+            call = partial(self.profiler.track_allocations, operation_id, call)
+        if self.recorder is None or name in self.ADMIN_TOOLS:
+            return await call()
+        return await self.recorder.record(session, name, operation_id, arguments, call)
+
+    async def _call_limited(self, session, name: str, operation_id: str, arguments: dict[str, Any]):
+        if self.rate_limiter is None:
+            return await super().call_tool(name, arguments)
+        try:
+            return await self.rate_limiter.run(
+                session,
+                operation_id,
+                lambda: super(PetstoreServer, self).call_tool(name, arguments)
+            )
+        except RateLimited as e:
+            return e.response()
+
+    def current_session(self):
+        """The client session of the request being handled, or None outside a request."""
+        try:
+            return self._mcp_server.request_context.session
+        except LookupError:
+            return None
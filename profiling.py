@@ -0,0 +1,157 @@
+"""
+On-demand profiling for a running server.
+
+While a profile is running, a background thread samples the event loop
+thread's stack every 'interval' seconds and counts identical stacks. The
+result is written in the collapsed-stack format read by flamegraph.pl and
+speedscope ("outer;inner;leaf count" per line). Optionally tracemalloc is
+switched on as well, and every tool call records how much traced memory it
+left allocated, grouped by operationId. Under concurrent calls these deltas
+overlap, so treat them as indicative rather than exact.
+
+Nothing runs while no profile is active: there is no sampler thread, and
+call_tool only checks one attribute.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+
+def frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse(frame) -> str:
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Profiler:
+    def __init__(self, output_dir: str = "profiles"):
+        self.output_dir = output_dir
+        self.tracking_allocations = False
+        self.last_report = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._stacks = Counter()
+        self._samples = 0
+        self._allocations = defaultdict(lambda: {"calls": 0, "netBytes": 0, "maxNetBytes": 0})
+        self._started = None
+        self._output = None
+        self._owns_tracemalloc = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, seconds: float, interval: float = 0.005, track_allocations: bool = False) -> str:
+        """
+        Start sampling the calling thread (the event loop) for 'seconds'.
+
+        Returns:
+            str: Path the collapsed stacks will be written to.
+
+        Raises RuntimeError if a profile is already running.
+        """
+        with self._lock:
+            if self._thread is not None:
+                raise RuntimeError("A profile is already running")
+
+            os.makedirs(self.output_dir, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            self._output = os.path.join(self.output_dir, f"profile-{stamp}.collapsed")
+            self._stacks = Counter()
+            self._samples = 0
+            self._allocations.clear()
+            self._started = time.monotonic()
+            self._stop.clear()
+
+            if track_allocations:
+                self._owns_tracemalloc = not tracemalloc.is_tracing()
+                if self._owns_tracemalloc:
+                    tracemalloc.start()
+                self.tracking_allocations = True
+
+            self._thread = threading.Thread(
+                target=self._sample,
+                args=(threading.get_ident(), seconds, interval),
+                name="profiler",
+                daemon=True
+            )
+            self._thread.start()
+            return self._output
+
+    async def stop(self) -> dict:
+        """
+        Stop the running profile (if any) and return its report.
+        The sampler thread writes the report, so it is joined off the event loop.
+        """
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            await asyncio.to_thread(thread.join)
+        return self.last_report
+
+    async def track_allocations(self, operation_id: str, call):
+        """Run 'call()' and add the traced memory it left allocated to operation_id."""
+        before = tracemalloc.get_traced_memory()[0]
+        try:
+            return await call()
+        finally:
+            if self.tracking_allocations and tracemalloc.is_tracing():
+                delta = tracemalloc.get_traced_memory()[0] - before
+                stats = self._allocations[operation_id]
+                stats["calls"] += 1
+                stats["netBytes"] += delta
+                stats["maxNetBytes"] = max(stats["maxNetBytes"], delta)
+
+    def _sample(self, thread_id: int, seconds: float, interval: float) -> None:
+        deadline = time.monotonic() + seconds
+        while not self._stop.wait(interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                self._stacks[collapse(frame)] += 1
+                self._samples += 1
+        self._finish()
+
+    def _finish(self) -> None:
+        with self._lock:
+            report = {
+                "output": self._output,
+                "seconds": round(time.monotonic() - self._started, 3),
+                "samples": self._samples,
+                "distinctStacks": len(self._stacks),
+            }
+            tracking = self.tracking_allocations
+            self.tracking_allocations = False
+            # whatever fails below, the profiler must end up stopped so the next start() works
+            try:
+                with open(self._output, "w", encoding="utf-8") as f:
+                    for stack, count in self._stacks.most_common():
+                        f.write(f"{stack} {count}\n")
+
+                if tracking:
+                    snapshot = tracemalloc.take_snapshot()
+                    # dict() copies in one step, so calls finishing on the loop thread can't break the iteration
+                    allocations = dict(self._allocations)
+                    report["allocations"] = {op: dict(stats) for op, stats in allocations.items()}
+                    report["topAllocations"] = [
+                        {"location": str(stat.traceback[0]), "sizeBytes": stat.size, "count": stat.count}
+                        for stat in snapshot.statistics("lineno")[:10]
+                    ]
+            except Exception as e:
+                # nobody is waiting on the sampler thread, so the report is where this surfaces
+                report["error"] = f"{type(e).__name__}: {e}"
+            finally:
+                if tracking and self._owns_tracemalloc:
+                    tracemalloc.stop()
+                self.last_report = report
+                self._thread = None
@@ -0,0 +1,203 @@
+import asyncio
+import itertools
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class Limit:
+    """Token-bucket limit: 'rate' calls per second on average, bursts of up to 'burst' calls."""
+    rate: float
+    burst: int
+
+
+class TokenBucket:
+    def __init__(self, limit: Limit):
+        self.limit = limit
+        self.tokens = float(limit.burst)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.limit.burst, self.tokens + (now - self.updated) * self.limit.rate)
+        self.updated = now
+
+    def retry_after(self) -> float:
+        """Seconds until one token is available (0 if one is available now)."""
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.limit.rate
+
+
+class RateLimited(Exception):
+    """Raised when a call is rejected; carries a 429-style tool response."""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    def response(self) -> dict:
+        response = {"error": str(self), "status": 429}
+        if self.retry_after is not None:
+            response["retryAfter"] = round(self.retry_after, 3)
+        return response
+
+
+class ClientState:
+    """Buckets, in-flight slots and counters for one client session."""
+
+    def __init__(self, client_id: int, limiter: "RateLimiter"):
+        self.client_id = client_id
+        self.bucket = TokenBucket(limiter.session_limit)
+        self.operation_buckets: Dict[str, TokenBucket] = {}
+        self.slots = asyncio.Semaphore(limiter.max_in_flight)
+        self.in_flight = 0
+        self.queued = 0
+        self.calls = 0
+        self.rejected = 0
+        # moving average of how long this session's calls run, for queue-full retryAfter
+        self.avg_duration = None
+
+    def record_duration(self, seconds: float) -> None:
+        if self.avg_duration is None:
+            self.avg_duration = seconds
+        else:
+            self.avg_duration += 0.2 * (seconds - self.avg_duration)
+
+    def stats(self) -> dict:
+        return {
+            "clientId": self.client_id,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "inFlight": self.in_flight,
+            "queued": self.queued,
+        }
+
+
+class RateLimiter:
+    """
+    Per-session rate limiting and backpressure for tool calls.
+
+    Each client session gets a token bucket shared by all of its calls, a
+    bucket per operationId listed in 'operation_limits', and at most
+    'max_in_flight' concurrent calls with up to 'max_queued' more waiting.
+    Anything beyond that is rejected with a 429 response instead of waiting.
+
+    Parameters:
+        session_limit (Limit): Budget for all calls of one session.
+        operation_limits (dict): operationId -> Limit, applied per session.
+        max_in_flight (int): Calls of one session allowed to run at once.
+        max_queued (int): Calls of one session allowed to wait for a slot.
+    """
+
+    def __init__(
+            self,
+            session_limit: Limit = Limit(rate=20, burst=40),
+            operation_limits: Optional[Dict[str, Limit]] = None,
+            max_in_flight: int = 4,
+            max_queued: int = 16
+    ):
+        self.session_limit = session_limit
+        self.operation_limits = dict(operation_limits or {})
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        # sessions drop out of the table when the connection object goes away
+        self._clients = weakref.WeakKeyDictionary()
+        self._local = None
+        self._ids = itertools.count(1)
+
+    def client(self, session) -> ClientState:
+        """State for a session; calls made outside a session share one state."""
+        if session is None:
+            if self._local is None:
+                self._local = ClientState(0, self)
+            return self._local
+        state = self._clients.get(session)
+        if state is None:
+            state = self._clients[session] = ClientState(next(self._ids), self)
+        return state
+
+    def admit(self, state: ClientState, operation_id: str) -> None:
+        """
+        Take one token from the session bucket and the operation bucket.
+        Tokens are only taken when both have one, so a rejection costs nothing.
+        Raises RateLimited otherwise.
+        """
+        buckets = [state.bucket]
+        limit = self.operation_limits.get(operation_id)
+        if limit is not None:
+            bucket = state.operation_buckets.get(operation_id)
+            if bucket is None:
+                bucket = state.operation_buckets[operation_id] = TokenBucket(limit)
+            buckets.append(bucket)
+
+        now = time.monotonic()
+        for bucket in buckets:
+            bucket.refill(now)
+        wait = max(bucket.retry_after() for bucket in buckets)
+        if wait > 0:
+            state.rejected += 1
+            raise RateLimited(f"Rate limit exceeded for {operation_id}", retry_after=wait)
+
+        for bucket in buckets:
+            bucket.tokens -= 1
+
+    async def run(self, session, operation_id: str, call):
+        """
+        Run 'call()' under the session's limits.
+        Raises RateLimited if the call is over budget or the session's queue is full.
+        """
+        state = self.client(session)
+        state.calls += 1
+
+        # checked before admit() so a call turned away here keeps the session's tokens
+        if state.slots.locked() and state.queued >= self.max_queued:
+            state.rejected += 1
+            raise RateLimited(
+                f"Too many pending calls ({state.in_flight} running, {state.queued} queued)",
+                retry_after=self.queue_retry_after(state)
+            )
+
+        self.admit(state, operation_id)
+
+        state.queued += 1
+        try:
+            await state.slots.acquire()
+        finally:
+            state.queued -= 1
+
+        state.in_flight += 1
+        started = time.monotonic()
+        try:
+            return await call()
+        finally:
+            state.record_duration(time.monotonic() - started)
+            state.in_flight -= 1
+            state.slots.release()
+
+    def queue_retry_after(self, state: ClientState) -> float:
+        """Rough time for the queue ahead to drain one slot's worth of calls."""
+        if state.avg_duration is None:
+            return 1 / self.session_limit.rate
+        waves = (state.queued + self.max_in_flight) / self.max_in_flight
+        return state.avg_duration * waves
+
+    def stats(self) -> dict:
+        clients = [state.stats() for state in self._clients.values()]
+        if self._local is not None:
+            clients.append(self._local.stats())
+        return {
+            "limits": {
+                "session": {"rate": self.session_limit.rate, "burst": self.session_limit.burst},
+                "operations": {
+                    op: {"rate": limit.rate, "burst": limit.burst}
+                    for op, limit in self.operation_limits.items()
+                },
+                "maxInFlight": self.max_in_flight,
+                "maxQueued": self.max_queued,
+            },
+            "inFlight": sum(c["inFlight"] for c in clients),
+            "queued": sum(c["queued"] for c in clients),
+            "clients": clients,
+        }
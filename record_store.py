@@ -0,0 +1,88 @@
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class VersionConflict(Exception):
+    """Raised when a write names a version that is no longer current."""
+
+    def __init__(self, key, expected: int, current: Optional[int]):
+        super().__init__(
+            f"Version conflict on '{key}': expected {expected}, current is {current}"
+        )
+        self.key = key
+        self.expected = expected
+        self.current = current
+
+
+class VersionedStore:
+    """
+    In-memory records with a version number per record, for the pet and user tools.
+
+    Every write gives the record the next version for its key. put(), delete()
+    and update() take an optional expected_version and refuse the write
+    (VersionConflict) if the record has moved on, i.e. compare-and-swap.
+    Passing 0 means "must not exist yet", which is how records are created.
+
+    Deleting a record keeps its last version as a tombstone, so a record
+    created again under the same key carries on from there instead of
+    restarting at 1: a client holding a version from before the delete can
+    never match the new record by accident. Tombstones are never dropped.
+
+    All methods are synchronous and never await, so each one runs to the end
+    without another tool call interleaving on the event loop; that is what
+    makes the compare-and-swap atomic, and no locks are needed. Code that
+    awaits between reading a record and writing it back must pass the version
+    it read as expected_version and retry on VersionConflict.
+    """
+
+    def __init__(self):
+        self._records: Dict[Hashable, dict] = {}
+        self._versions: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, key) -> bool:
+        return key in self._records
+
+    def get(self, key) -> Tuple[Optional[dict], int]:
+        """Returns (record, version), or (None, 0) if there is no such record."""
+        if key not in self._records:
+            return None, 0
+        return self._records[key], self._versions[key]
+
+    def _check(self, key, expected_version: Optional[int]) -> int:
+        current = self.get(key)[1]
+        if expected_version is not None and expected_version != current:
+            raise VersionConflict(key, expected_version, current or None)
+        return current
+
+    def put(self, key, record: dict, expected_version: int = None) -> int:
+        """Create or replace a record; returns its new version."""
+        self._check(key, expected_version)
+        version = self._versions.get(key, 0) + 1
+        self._records[key] = record
+        self._versions[key] = version
+        return version
+
+    def delete(self, key, expected_version: int = None) -> Optional[dict]:
+        """Remove a record; returns it, or None if there was no such record."""
+        if key not in self._records:
+            return None
+        self._check(key, expected_version)
+        return self._records.pop(key)
+
+    def update(self, key, changes: dict, expected_version: int = None) -> Tuple[Optional[dict], int]:
+        """
+        Merge 'changes' into an existing record.
+
+        Returns:
+            tuple: (updated record, new version), or (None, 0) if there is no such record.
+
+        Raises VersionConflict if expected_version is given and stale.
+        """
+        record, version = self.get(key)
+        if record is None:
+            return None, 0
+        self._check(key, expected_version)
+        merged = {**record, **changes}
+        return merged, self.put(key, merged, version)
@@ -0,0 +1,128 @@
+"""
+Replay a traffic log recorded with PETSTORE_RECORD_LOG against a running server.
+
+Calls are issued at their recorded offsets divided by --speed (1 = original
+pace, 10 = ten times faster, max = as fast as possible with at most
+--concurrency calls outstanding). Each recorded client gets its own SSE
+session, so per-session limits behave as they did in production. Latency
+percentiles are printed per operationId next to the recorded ones.
+
+    python main.py                                  # in another shell
+    python replay.py traffic.log --speed 10
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from traffic import read_log
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def is_rejected(result) -> bool:
+    """True if the server turned the call away with a 429 response."""
+    payload = result.structuredContent
+    if payload is None and result.content:
+        try:
+            payload = json.loads(getattr(result.content[0], "text", ""))
+        except ValueError:
+            return False
+    return isinstance(payload, dict) and payload.get("status") == 429
+
+
+def report(results: dict, recorded: dict, elapsed: float) -> None:
+    header = f"{'operation':<28}{'calls':>7}{'errors':>8}{'429':>6}" \
+             f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'rec p50':>9}"
+    print(header)
+    print("-" * len(header))
+
+    total = 0
+    for op in sorted(results):
+        latencies = sorted(r["latency"] for r in results[op])
+        errors = sum(r["error"] for r in results[op])
+        rejected = sum(r["rejected"] for r in results[op])
+        total += len(latencies)
+        print(f"{op:<28}{len(latencies):>7}{errors:>8}{rejected:>6}"
+              f"{percentile(latencies, 50) * 1000:>9.2f}"
+              f"{percentile(latencies, 90) * 1000:>9.2f}"
+              f"{percentile(latencies, 99) * 1000:>9.2f}"
+              f"{latencies[-1] * 1000:>9.2f}"
+              f"{percentile(sorted(recorded[op]), 50) * 1000:>9.2f}")
+
+    print(f"\n{total} calls in {elapsed:.2f}s ({total / elapsed:,.1f} calls/s)")
+
+
+async def replay(args) -> None:
+    records = sorted(read_log(args.log), key=lambda r: r["t"])
+    if not records:
+        print(f"No records in {args.log}")
+        return
+
+    speed = float("inf") if args.speed == "max" else float(args.speed)
+    slots = asyncio.Semaphore(args.concurrency)
+    results = defaultdict(list)
+    recorded = defaultdict(list)
+    for record in records:
+        recorded[record["op"]].append(record["dur"])
+
+    async with AsyncExitStack() as stack:
+        sessions = {}
+        for client in sorted({r["client"] for r in records}):
+            read, write = await stack.enter_async_context(sse_client(args.url))
+            session = await stack.enter_async_context(ClientSession(read, write))
+            await session.initialize()
+            sessions[client] = session
+
+        async def fire(record: dict) -> None:
+            try:
+                started = time.perf_counter()
+                try:
+                    result = await sessions[record["client"]].call_tool(record["tool"], record["args"])
+                    error = result.isError
+                    rejected = is_rejected(result)
+                except Exception:
+                    error, rejected = True, False
+                results[record["op"]].append({
+                    "latency": time.perf_counter() - started,
+                    "error": error,
+                    "rejected": rejected,
+                })
+            finally:
+                slots.release()
+
+        tasks = []
+        start = time.perf_counter()
+        first = records[0]["t"]
+        for record in records:
+            delay = (record["t"] - first) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await slots.acquire()
+            tasks.append(asyncio.create_task(fire(record)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    report(results, recorded, elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("log", help="traffic log written by the server")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/sse")
+    parser.add_argument("--speed", default="1", help="replay speed multiplier, or 'max'")
+    parser.add_argument("--concurrency", type=int, default=64,
+                        help="maximum calls outstanding at once")
+    args = parser.parse_args()
+
+    asyncio.run(replay(args))
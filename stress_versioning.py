@@ -0,0 +1,130 @@
+"""
+Stress test for the versioned pet and user tools.
+
+Many concurrent writers increment counters kept in pet and user records by
+calling the tools in main.py: each reads the record, yields to the event
+loop so other writers can get in between, then writes it back with the
+version it read as expectedVersion, retrying on 409. Pet writers alternate
+between update_pet_with_form and update_Pet on the same pets; user writers
+use updateUser. At the end every counter and version must account for every
+increment, i.e. no update was lost.
+
+The run is repeated at each concurrency level in --writers, on fresh
+records, printing throughput and how many writes had to be retried after a
+409 (retries per successful write). With more writers per record, more of
+them read the same version and all but one have to retry.
+
+    python stress_versioning.py --writers 1,10,50,200 --records 50 --increments 20
+"""
+import argparse
+import asyncio
+import time
+
+import main
+from record_store import VersionedStore
+
+
+async def seed(records: int) -> None:
+    for key in range(1, records + 1):
+        await main.add_Pet({"id": key, "name": "0", "photoUrls": []}, echo=False)
+        await main.createUser({"id": key, "username": f"user{key}", "password": "x", "userStatus": 0},
+                              echo=False)
+
+
+async def increment_pet(pet_id: int, use_form: bool) -> int:
+    """Add one to the pet's counter; returns the number of 409 retries it took."""
+    retries = 0
+    while True:
+        current = await main.get_pet_by_id(pet_id)
+        await asyncio.sleep(0)
+        count = str(int(current["pet"]["name"]) + 1)
+        if use_form:
+            result = await main.update_pet_with_form(pet_id, name=count, expectedVersion=current["version"])
+            status = result["code"]
+        else:
+            pet = {**current["pet"], "name": count}
+            result = await main.update_Pet(pet, echo=False, expectedVersion=current["version"])
+            status = result["status"]
+        if status != 409:
+            assert status == 200, result
+            return retries
+        retries += 1
+
+
+async def increment_user(username: str) -> int:
+    retries = 0
+    while True:
+        current = await main.get_user_by_name(username)
+        await asyncio.sleep(0)
+        changes = {"userStatus": current["user"]["userStatus"] + 1}
+        result = await main.updateUser(username, changes, echo=False, expectedVersion=current["version"])
+        if result["code"] != 409:
+            assert result["code"] == 200, result
+            return retries
+        retries += 1
+
+
+async def writer(number: int, records: int, increments: int) -> int:
+    retries = 0
+    for i in range(increments):
+        key = (number + i) % records + 1
+        retries += await increment_pet(key, use_form=(number + i) % 2 == 0)
+        retries += await increment_user(f"user{key}")
+    return retries
+
+
+def lost_updates(records: int, expected: int) -> list:
+    """Kinds of record ('pet', 'user') whose counters or versions don't add up to 'expected'."""
+    pets = [main.pet_store.get(key) for key in range(1, records + 1)]
+    users = [main.user_store.get(f"user{key}") for key in range(1, records + 1)]
+    lost = []
+    for kind, counts, versions in (
+            ("pet", [int(pet["name"]) for pet, _ in pets], [v for _, v in pets]),
+            ("user", [user["userStatus"] for user, _ in users], [v for _, v in users]),
+    ):
+        # every increment is one write on top of the version the record was created with
+        if sum(counts) != expected or sum(versions) != expected + records:
+            lost.append(kind)
+    return lost
+
+
+async def run_level(writers: int, records: int, increments: int) -> bool:
+    main.pet_store = VersionedStore()
+    main.user_store = VersionedStore()
+    await seed(records)
+
+    start = time.perf_counter()
+    retries = sum(await asyncio.gather(
+        *[writer(w, records, increments) for w in range(writers)]
+    ))
+    elapsed = time.perf_counter() - start
+
+    writes = 2 * writers * increments
+    lost = lost_updates(records, writers * increments)
+    status = f"LOST UPDATES ({', '.join(lost)})" if lost else "ok"
+    print(f"{writers:>8}{writers / records:>12.2f}{writes:>9}{elapsed:>9.3f}"
+          f"{writes / elapsed:>11,.0f}{retries:>9}{retries / writes:>12.2f}  {status}")
+    return not lost
+
+
+async def run(args) -> bool:
+    print(f"{args.records} pets and {args.records} users, {args.increments} increments of each per writer")
+    print(f"{'writers':>8}{'per record':>12}{'writes':>9}{'seconds':>9}"
+          f"{'writes/s':>11}{'retries':>9}{'retry rate':>12}")
+    ok = True
+    for writers in args.writers:
+        ok &= await run_level(writers, args.records, args.increments)
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", default="1,10,50,200",
+                        type=lambda s: [int(n) for n in s.split(",")],
+                        help="comma-separated concurrency levels to sweep")
+    parser.add_argument("--records", type=int, default=50)
+    parser.add_argument("--increments", type=int, default=20)
+    args = parser.parse_args()
+
+    if not asyncio.run(run(args)):
+        raise SystemExit(1)
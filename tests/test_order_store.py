@@ -0,0 +1,122 @@
+import random
+from bisect import bisect_left, bisect_right, insort
+
+import pytest
+
+from order_store import OrderStore, SortedKeys, parse_ship_date
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(SortedKeys, "CHUNK", 4)
+
+
+def test_sorted_keys_split_and_remove_match_a_flat_list(small_chunks):
+    rng = random.Random(7)
+    keys = SortedKeys()
+    reference = []
+
+    for _ in range(3000):
+        key = (float(rng.randint(0, 40)), rng.randint(0, 100))
+        if rng.random() < 0.6:
+            if key not in reference:
+                keys.add(key)
+                insort(reference, key)
+        else:
+            assert keys.remove(key) == (key in reference)
+            if key in reference:
+                reference.remove(key)
+
+        probe = (float(rng.randint(0, 40)),)
+        assert len(keys) == len(reference)
+        assert keys.bisect_left(probe) == bisect_left(reference, probe)
+        assert keys.bisect_right(key) == bisect_right(reference, key)
+        lo = rng.randint(0, len(reference))
+        hi = rng.randint(lo, len(reference) + 2)
+        assert keys.slice(lo, hi) == reference[lo:hi]
+
+    # chunks were split on the way up and dropped once emptied
+    assert all(len(chunk) <= 2 * SortedKeys.CHUNK for chunk in keys._chunks)
+    assert all(keys._chunks)
+
+
+def test_remove_last_key_of_a_chunk_drops_the_chunk(small_chunks):
+    keys = SortedKeys()
+    for i in range(10):
+        keys.add((float(i), i))
+    chunks = len(keys._chunks)
+
+    for i in range(4):
+        assert keys.remove((float(i), i))
+    assert not keys.remove((0.0, 0))
+    assert len(keys._chunks) == chunks - 1
+    assert keys.slice(0, len(keys)) == [(float(i), i) for i in range(4, 10)]
+
+
+def fill(store, count=20):
+    for i in range(count):
+        store.put({
+            "id": i,
+            "shipDate": f"2026-01-{i + 1:02d}T00:00:00Z",
+            "status": ["placed", "approved", "delivered"][i % 3],
+        })
+
+
+def test_cursor_pages_cover_the_window_once(small_chunks):
+    store = OrderStore()
+    fill(store)
+    start, end = parse_ship_date("2026-01-03"), parse_ship_date("2026-01-18")
+
+    seen, after = [], None
+    while True:
+        page, total, after = store.range(start, end, after=after, limit=4)
+        seen.extend(order["id"] for order in page)
+        assert total == 15
+        if after is None:
+            break
+
+    assert seen == list(range(2, 17))
+
+
+def test_status_window_and_counts():
+    store = OrderStore()
+    fill(store)
+    start, end = parse_ship_date("2026-01-03"), parse_ship_date("2026-01-09")
+
+    page, total, after = store.range(start, end, status="approved")
+    assert [o["id"] for o in page] == [4, 7]
+    assert total == 2 and after is None
+    assert store.count_by_status(start, end) == {"placed": 2, "approved": 2, "delivered": 2}
+    assert sum(store.count_by_status().values()) == len(store)
+
+
+def test_replacing_and_deleting_keep_indexes_in_step():
+    store = OrderStore()
+    fill(store, 3)
+    store.put({"id": 0, "shipDate": "2026-02-01T00:00:00Z", "status": "delivered"})
+    assert store.delete(1)["id"] == 1
+    assert store.delete(1) is None
+
+    page, total, _ = store.range()
+    assert [o["id"] for o in page] == [2, 0]
+    assert store.count_by_status() == {"placed": 0, "approved": 0, "delivered": 2}
+
+
+def test_ship_date_is_indexed_at_millisecond_precision():
+    store = OrderStore()
+    stored = store.put({"id": 1, "shipDate": "2026-01-01T00:00:00.123999Z"})
+    assert stored["shipDate"] == "2026-01-01T00:00:00.123Z"
+
+    boundary = parse_ship_date(stored["shipDate"])
+    assert [o["id"] for o in store.range(start=boundary)[0]] == [1]
+    assert store.range(end=boundary)[0] == []
+
+
+def test_invalid_orders_are_rejected():
+    store = OrderStore()
+    with pytest.raises(ValueError):
+        store.put({"id": "1"})
+    with pytest.raises(ValueError):
+        store.put({"id": 1, "status": "lost"})
+    with pytest.raises(ValueError):
+        store.put({"id": 1, "shipDate": "yesterday"})
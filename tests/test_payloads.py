@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+import main
+from payloads import MAX_PAGE_SIZE, paginate, parse_fields, project
+
+
+def call(tool, *args, **kwargs):
+    return asyncio.run(tool(*args, **kwargs))
+
+
+def test_cursor_walks_every_page_once():
+    items = list(range(7))
+    seen, cursor, pages = [], None, 0
+    while True:
+        page, cursor = paginate(items, 3, cursor)
+        seen.extend(page)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert seen == items and pages == 3
+    # a list that fits on one page has no next cursor either
+    assert paginate(items, 7) == (items, None)
+    assert paginate([], 5) == ([], None)
+
+
+@pytest.mark.parametrize("limit", [0, MAX_PAGE_SIZE + 1])
+def test_limit_out_of_bounds_is_rejected(limit):
+    with pytest.raises(ValueError):
+        paginate([1, 2, 3], limit)
+    result = call(main.find_Pet_By_Status, "available", limit=limit)
+    assert result["status"] == 400
+    assert call(main.list_orders_by_ship_date, limit=limit)["status"] == 400
+
+
+def test_limit_bounds_are_inclusive():
+    assert paginate([1, 2], 1) == ([1], "1")
+    assert paginate([1, 2], MAX_PAGE_SIZE) == ([1, 2], None)
+
+
+@pytest.mark.parametrize("cursor", ["abc", "-1", "1.5"])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        paginate([1, 2, 3], 1, cursor)
+    assert call(main.find_Pet_By_Status, "available", cursor=cursor)["status"] == 400
+    assert "error" in call(main.find_pets_by_tags, "tag1", cursor=cursor)
+    assert call(main.list_orders_by_ship_date, cursor=cursor)["status"] == 400
+
+
+def test_tools_page_with_next_cursor_none_on_the_last_page():
+    first = call(main.find_pets_by_tags, "tag1", limit=1)
+    assert [p["id"] for p in first["result"]] == [101]
+    last = call(main.find_pets_by_tags, "tag1", limit=1, cursor=first["nextCursor"])
+    assert [p["id"] for p in last["result"]] == [202]
+    assert last["nextCursor"] is None
+
+
+def test_projection_skips_unknown_keys():
+    assert parse_fields(" id, ,name ") == ["id", "name"]
+    assert parse_fields(["id", " "]) == ["id"]
+    assert parse_fields("") is None and parse_fields(None) is None
+
+    items = [{"id": 1, "name": "a", "status": "sold"}, {"id": 2}]
+    assert project(items, ["id", "name", "missing"]) == [{"id": 1, "name": "a"}, {"id": 2}]
+    assert project(items, None) is items
+
+    result = call(main.find_Pet_By_Status, "available", fields="name,nope")
+    assert result["pets"] == [{"name": "Doggo"}]
+
+
+def test_echo_false_drops_only_the_payload():
+    pet = {"id": 7001, "name": "rex", "photoUrls": []}
+    echoed = call(main.add_Pet, pet)
+    assert echoed["pet"] == pet
+    quiet = call(main.update_Pet, pet, echo=False)
+    assert "pet" not in quiet
+    assert set(quiet) == {"status", "operationId", "method", "path", "contentType", "version"}
+
+    order = {"id": 7001, "petId": 7001, "quantity": 1}
+    assert call(main.placeOrder, order)["order"]["id"] == 7001
+    quiet = call(main.placeOrder, order, echo=False)
+    assert "order" not in quiet and quiet["orderId"] == 7001
+
+    user = {"id": 7001, "username": "echo-test", "password": "x"}
+    assert call(main.createUser, user)["user"] == user
+    quiet = call(main.createUser, {**user, "username": "echo-test-quiet"}, echo=False)
+    assert "user" not in quiet and set(quiet) == {"status", "message", "version", "content_types"}
+    quiet = call(main.updateUser, "echo-test", {"email": "e@example.com"}, echo=False)
+    assert "updated_user" not in quiet and quiet["code"] == 200
+
+    users = [{"id": 7002, "username": "echo-test-2", "password": "x"}]
+    quiet = call(main.create_users_with_list_input, users, echo=False)
+    assert "users" not in quiet
+    assert set(quiet) == {"status", "message", "content_types"}
+
+    users = [{"id": 7003, "username": "echo-test-3", "password": "x"}]
+    projected = call(main.create_users_with_list_input, users, fields="username")
+    assert projected["users"] == [{"username": "echo-test-3"}]
+
+    tags = call(main.find_pets_by_tags, "tag1", echo=False)
+    assert "request" not in tags and set(tags) == {"operationId", "result", "nextCursor"}
@@ -0,0 +1,44 @@
+import asyncio
+import os
+
+from profiling import Profiler
+
+
+def busy(seconds):
+    deadline = asyncio.get_running_loop().time() + seconds
+    while asyncio.get_running_loop().time() < deadline:
+        sum(range(1000))
+
+
+def test_stop_returns_report_and_writes_stacks(tmp_path):
+    profiler = Profiler(output_dir=str(tmp_path))
+
+    async def scenario():
+        output = profiler.start(seconds=30, interval=0.001, track_allocations=True)
+        busy(0.05)
+        report = await profiler.stop()
+        return output, report
+
+    output, report = asyncio.run(scenario())
+    assert not profiler.running and not profiler.tracking_allocations
+    assert report["output"] == output and os.path.exists(output)
+    assert report["samples"] > 0 and "topAllocations" in report
+
+
+def test_failed_write_leaves_profiler_stopped(tmp_path):
+    profiler = Profiler(output_dir=str(tmp_path))
+
+    async def scenario():
+        profiler.start(seconds=30, interval=0.001, track_allocations=True)
+        profiler._output = str(tmp_path)  # a directory, so the write fails
+        return await profiler.stop()
+
+    report = asyncio.run(scenario())
+    assert not profiler.running and not profiler.tracking_allocations
+    assert "error" in report
+
+    async def again():
+        profiler.start(seconds=30, interval=0.001)
+        return await profiler.stop()
+
+    assert "error" not in asyncio.run(again())
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from rate_limit import Limit, RateLimited, RateLimiter
+
+
+class Session:
+    pass
+
+
+def test_rejected_call_takes_no_tokens():
+    limiter = RateLimiter(
+        session_limit=Limit(rate=0.001, burst=5),
+        operation_limits={"findPetsByTags": Limit(rate=0.001, burst=2)},
+    )
+    state = limiter.client(Session())
+
+    limiter.admit(state, "findPetsByTags")
+    limiter.admit(state, "findPetsByTags")
+    with pytest.raises(RateLimited) as rejected:
+        limiter.admit(state, "findPetsByTags")
+
+    assert rejected.value.response()["status"] == 429
+    assert rejected.value.response()["retryAfter"] > 0
+    # the operation bucket refused the call, so the session bucket kept its token
+    assert state.bucket.tokens == pytest.approx(3, abs=0.01)
+    limiter.admit(state, "getPetById")
+    assert state.bucket.tokens == pytest.approx(2, abs=0.01)
+
+
+def test_queue_full_rejects_without_spending_tokens():
+    limiter = RateLimiter(session_limit=Limit(rate=0.001, burst=100), max_in_flight=1, max_queued=1)
+    session = Session()
+    release = asyncio.Event()
+
+    async def blocked():
+        await release.wait()
+        return "done"
+
+    async def scenario():
+        running = asyncio.create_task(limiter.run(session, "op", blocked))
+        queued = asyncio.create_task(limiter.run(session, "op", blocked))
+        await asyncio.sleep(0)
+        state = limiter.client(session)
+        assert (state.in_flight, state.queued) == (1, 1)
+        tokens = state.bucket.tokens
+
+        with pytest.raises(RateLimited) as rejected:
+            await limiter.run(session, "op", blocked)
+        assert state.bucket.tokens == pytest.approx(tokens, abs=0.01)
+        assert rejected.value.response()["retryAfter"] > 0
+
+        release.set()
+        assert await asyncio.gather(running, queued) == ["done", "done"]
+        assert limiter.stats()["clients"][0]["rejected"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_sessions_have_separate_budgets():
+    limiter = RateLimiter(session_limit=Limit(rate=0.001, burst=1))
+    first, second = limiter.client(Session()), limiter.client(Session())
+    limiter.admit(first, "op")
+    with pytest.raises(RateLimited):
+        limiter.admit(first, "op")
+    limiter.admit(second, "op")
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from record_store import VersionConflict, VersionedStore
+
+
+def test_put_is_compare_and_swap():
+    store = VersionedStore()
+    assert store.put("a", {"n": 1}, expected_version=0) == 1
+    assert store.put("a", {"n": 2}, expected_version=1) == 2
+
+    with pytest.raises(VersionConflict) as conflict:
+        store.put("a", {"n": 3}, expected_version=1)
+    assert (conflict.value.expected, conflict.value.current) == (1, 2)
+    assert store.get("a") == ({"n": 2}, 2)
+
+    with pytest.raises(VersionConflict):
+        store.put("a", {"n": 3}, expected_version=0)
+    with pytest.raises(VersionConflict):
+        store.put("b", {"n": 1}, expected_version=1)
+
+
+def test_update_merges_and_checks_version():
+    store = VersionedStore()
+    store.put("a", {"n": 1, "name": "x"})
+    assert store.update("a", {"n": 2}, expected_version=1) == ({"n": 2, "name": "x"}, 2)
+    with pytest.raises(VersionConflict):
+        store.update("a", {"n": 3}, expected_version=1)
+    assert store.update("missing", {"n": 1}) == (None, 0)
+
+
+def test_versions_never_repeat_after_delete():
+    store = VersionedStore()
+    store.put("a", {"n": 1}, expected_version=0)
+    store.put("a", {"n": 2}, expected_version=1)
+    assert store.delete("a", expected_version=2) == {"n": 2}
+    assert store.get("a") == (None, 0)
+    assert "a" not in store and len(store) == 0
+    assert store.delete("a") is None
+
+    # recreated record continues past the tombstone, so the old version 1 cannot match it
+    assert store.put("a", {"n": 10}, expected_version=0) == 3
+    with pytest.raises(VersionConflict):
+        store.put("a", {"n": 11}, expected_version=1)
+    with pytest.raises(VersionConflict):
+        store.delete("a", expected_version=2)
+
+
+def test_create_tools_refuse_existing_records():
+    import main
+
+    async def scenario():
+        pet = {"id": 9001, "name": "rex", "photoUrls": []}
+        assert (await main.add_Pet(pet))["status"] == 200
+        assert (await main.add_Pet({**pet, "name": "other"}))["status"] == 409
+        assert main.pet_store.get(9001)[0]["name"] == "rex"
+
+        user = {"id": 1, "username": "create-test", "password": "x"}
+        assert (await main.createUser(user))["status"] == 200
+        assert (await main.createUser({**user, "password": "y"}))["status"] == 409
+        assert main.user_store.get("create-test")[0]["password"] == "x"
+
+        fresh = {"id": 2, "username": "create-test-2", "password": "x"}
+        result = await main.create_users_with_list_input([fresh, user])
+        assert result["status"] == 409
+        assert "create-test-2" not in main.user_store
+
+        result = await main.create_users_with_list_input([fresh, fresh])
+        assert result["status"] == 409
+        assert "create-test-2" not in main.user_store
+
+    asyncio.run(scenario())
@@ -0,0 +1,136 @@
+import asyncio
+
+from mcp.server.fastmcp import FastMCP
+
+from tool_catalog import DESCRIPTION_OVERRIDES, argument_docs, build_catalog, source_hash
+
+DOCSTRING = """
+    Place a new order in the store.
+
+    Parameters:
+        order (dict): Order object containing at least 'id'.
+                      Optional fields: 'shipDate' (defaults to now)
+        echo (bool, optional): Set to False to leave the order out.
+        limit (int, optional): Page size. Defaults to 50.
+
+    Returns:
+        dict: The stored order.
+"""
+
+SPEC = {
+    "paths": {
+        "/store/order": {
+            "post": {
+                "operationId": "placeOrder",
+                "summary": "Place an order for a pet.",
+                "description": "Place a new order in the store.",
+                "requestBody": {
+                    "content": {"application/json": {"schema": {
+                        "type": "object", "xml": {"name": "order"},
+                        "properties": {"id": {"type": "integer"}},
+                    }}},
+                },
+            },
+        },
+        "/pet/findByStatus": {
+            "get": {
+                "operationId": "findPetsByStatus",
+                "summary": "Finds Pets by status.",
+                "description": "Multiple status values can be provided with comma separated strings.",
+                "parameters": [{
+                    "name": "status",
+                    "description": "Status values that need to be considered for filter",
+                    "schema": {"type": "string", "enum": ["available", "pending", "sold"]},
+                }],
+            },
+        },
+    },
+}
+
+
+def test_argument_docs_joins_continuation_lines():
+    docs = argument_docs(DOCSTRING)
+
+    assert list(docs) == ["order", "echo", "limit"]
+    line, text = docs["order"]
+    assert text == "Order object containing at least 'id'. Optional fields: 'shipDate' (defaults to now)"
+    assert line == ("  order (dict): Order object containing at least 'id'.\n"
+                    "    Optional fields: 'shipDate' (defaults to now)")
+    assert docs["limit"][1] == "Page size. Defaults to 50."
+    # 'dict: The stored order.' under Returns has no '(type)' and is not an argument
+    assert argument_docs(None) == {}
+
+
+def make_tools():
+    server = FastMCP("test")
+
+    @server.tool()
+    async def placeOrder(order: dict, echo: bool = True) -> dict:
+        """
+        Place a new order in the store.
+
+        Parameters:
+            order (dict): Order object; 'shipDate' defaults to now.
+            echo (bool, optional): Set to False to leave the order out.
+        """
+        return order
+
+    @server.tool()
+    async def find_Pet_By_Status(status: str = "available", limit: int = 50) -> dict:
+        """
+        Finds pets by status.
+
+        Parameters:
+            status (str, optional): Pet status to filter by. Defaults to 'available'.
+            limit (int, optional): Page size. Defaults to 50.
+        """
+        return {}
+
+    @server.tool()
+    async def get_rate_limit_stats() -> dict:
+        """Not a Petstore endpoint."""
+        return {}
+
+    return server
+
+
+def test_build_catalog_merges_spec_and_docstrings():
+    server = make_tools()
+    catalog = {t["name"]: t for t in build_catalog(SPEC, asyncio.run(server.list_tools()))}
+
+    order = catalog["placeOrder"]
+    assert order["description"].splitlines() == [
+        "Place an order for a pet.",
+        "Place a new order in the store.",
+        "Path: POST /store/order, operationId: placeOrder",
+        "Parameters:",
+        "  echo (bool, optional): Set to False to leave the order out.",
+    ]
+    body = order["inputSchema"]["properties"]["order"]
+    assert body["properties"] == {"id": {"type": "integer"}} and "xml" not in body
+    assert body["description"] == "Order object; 'shipDate' defaults to now."
+
+    by_status = catalog["find_Pet_By_Status"]
+    assert DESCRIPTION_OVERRIDES["find_Pet_By_Status"] in by_status["description"]
+    assert "comma separated" not in by_status["description"]
+    status = by_status["inputSchema"]["properties"]["status"]
+    assert status["enum"] == ["available", "pending", "sold"]
+    assert status["default"] == "available"
+    assert status["description"] == ("Status values that need to be considered for filter\n"
+                                     "Pet status to filter by. Defaults to 'available'.")
+
+    # tools without an operationId are passed through as FastMCP derives them
+    assert catalog["get_rate_limit_stats"]["description"] == "Not a Petstore endpoint."
+
+
+def test_source_hash_tracks_spec_and_tools(tmp_path):
+    spec = tmp_path / "petstore.yaml"
+    spec.write_text("openapi: 3.0.2\n")
+    tools = make_tools()._tool_manager.list_tools()
+
+    first = source_hash(tools, str(spec))
+    assert source_hash(make_tools()._tool_manager.list_tools(), str(spec)) == first
+    assert source_hash(tools[:-1], str(spec)) != first
+
+    spec.write_text("openapi: 3.0.3\n")
+    assert source_hash(tools, str(spec)) != first
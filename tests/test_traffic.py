@@ -0,0 +1,71 @@
+import asyncio
+
+from traffic import REDACTED, TrafficRecorder, read_log
+
+
+def test_credentials_are_redacted_in_the_log(tmp_path):
+    path = str(tmp_path / "traffic.log")
+    recorder = TrafficRecorder(path)
+    users = [
+        {"id": 1, "username": "ann", "password": "secret", "email": "ann@example.com"},
+        {"id": 2, "username": "bob", "password": "hunter2", "Phone": "555"},
+    ]
+
+    async def ok():
+        return {"status": 200}
+
+    async def scenario():
+        await recorder.record(None, "loginUser", "loginUser", {"username": "ann", "password": "secret"}, ok)
+        await recorder.record(None, "create_users_with_list_input", "createUsersWithListInput",
+                              {"users": users}, ok)
+
+    asyncio.run(scenario())
+    recorder.close()
+
+    login, create = read_log(path)
+    assert login["args"] == {"username": "ann", "password": REDACTED}
+    assert create["args"]["users"] == [
+        {"id": 1, "username": "ann", "password": REDACTED, "email": REDACTED},
+        {"id": 2, "username": "bob", "password": REDACTED, "Phone": REDACTED},
+    ]
+    # the arguments passed on to the tool are left alone
+    assert users[0]["password"] == "secret"
+    assert b"secret" not in open(path, "rb").read()
+
+
+def test_admin_calls_are_not_recorded(tmp_path, monkeypatch):
+    import main
+
+    path = str(tmp_path / "traffic.log")
+    monkeypatch.setattr(main.server, "recorder", TrafficRecorder(path))
+    monkeypatch.setattr(main.server, "admin_token", "s3cret")
+
+    async def scenario():
+        await main.server.call_tool("stop_profiler", {"adminToken": "s3cret"})
+        await main.server.call_tool("getInventory", {})
+
+    asyncio.run(scenario())
+    main.server.recorder.close()
+
+    assert [r["tool"] for r in read_log(path)] == ["getInventory"]
+    assert b"s3cret" not in open(path, "rb").read()
+
+
+def test_records_reach_the_file_without_another_call(tmp_path, monkeypatch):
+    monkeypatch.setattr(TrafficRecorder, "FLUSH_INTERVAL", 0.05)
+    path = str(tmp_path / "traffic.log")
+    recorder = TrafficRecorder(path)
+
+    async def ok():
+        return {"status": 200}
+
+    async def scenario():
+        for _ in range(3):
+            await recorder.record(None, "getInventory", "getInventory", {}, ok)
+        assert len(list(read_log(path))) == 0
+        # the server goes idle: the timer flushes without waiting for a fourth call
+        await asyncio.sleep(0.2)
+        assert len(list(read_log(path))) == 3
+
+    asyncio.run(scenario())
+    recorder.close()
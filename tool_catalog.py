@@ -0,0 +1,247 @@
+"""
+Prebuilt tool catalogue for list_tools.
+
+Run `python tool_catalog.py` after changing main.py or specs/petstore.yaml to
+regenerate specs/tool_catalog.json. Each tool starts from the schema FastMCP
+derives from its signature. For tools mapped to an operationId:
+  - the description becomes the spec's summary and description, followed by
+    the docstring lines of the arguments the spec does not describe. Where the
+    spec's description does not match what the tool does (petstore3's test
+    hints, comma-separated statuses), DESCRIPTION_OVERRIDES replaces it;
+  - arguments backed by a spec parameter or request body take the resolved
+    spec schema, unless the tool accepts a different type (e.g. 'tags' as a
+    comma-separated string), in which case the derived schema is kept. The
+    docstring line is kept in the argument's description next to the spec's;
+  - every other argument keeps its derived schema, described by its docstring line.
+
+The file also stores a hash of the derived tool list and the spec, so the
+server can tell when the catalogue is out of date.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import re
+
+from mcp.server.fastmcp import FastMCP
+
+SPEC_PATH = "specs/petstore.yaml"
+CATALOG_PATH = "specs/tool_catalog.json"
+
+# tool name -> (operationId, name of the argument carrying the request body)
+TOOL_OPERATIONS = {
+    "update_Pet": ("updatePet", "pet"),
+    "add_Pet": ("addPet", "pet"),
+    "find_Pet_By_Status": ("findPetsByStatus", None),
+    "find_pets_by_tags": ("findPetsByTags", None),
+    "get_pet_by_id": ("getPetById", None),
+    "update_pet_with_form": ("updatePetWithForm", None),
+    "deletePet": ("deletePet", None),
+    "upload_pet_image": ("uploadFile", "image"),
+    "getInventory": ("getInventory", None),
+    "placeOrder": ("placeOrder", "order"),
+    "get_order_by_Id": ("getOrderById", None),
+    "deleteOrder": ("deleteOrder", None),
+    "createUser": ("createUser", "user"),
+    "create_users_with_list_input": ("createUsersWithListInput", "users"),
+    "loginUser": ("loginUser", None),
+    "logoutUser": ("logoutUser", None),
+    "get_user_by_name": ("getUserByName", None),
+    "updateUser": ("updateUser", "user"),
+    "deleteUser": ("deleteUser", None),
+}
+
+# tool name -> description used instead of the spec's, for operations that behave
+# differently here than in petstore3
+DESCRIPTION_OVERRIDES = {
+    "find_Pet_By_Status": "Takes one status per call: available, pending or sold.",
+    "find_pets_by_tags": "Multiple tags can be provided as a comma-separated string or a list.",
+    "get_order_by_Id": "Returns an order previously placed with placeOrder.",
+    "deleteOrder": "Removes an order previously placed with placeOrder.",
+    "get_user_by_name": "Returns a user created with createUser or createUsersWithListInput.",
+}
+
+
+def operations_by_id(spec: dict) -> dict:
+    """Map operationId -> (method, path, operation) for every operation in the spec."""
+    operations = {}
+    for path, methods in spec["paths"].items():
+        for method, details in methods.items():
+            if isinstance(details, dict) and "operationId" in details:
+                operations[details["operationId"]] = (method, path, details)
+    return operations
+
+
+def strip_xml(schema):
+    """Drop the 'xml' hints that only matter to the XML media types."""
+    if isinstance(schema, dict):
+        return {k: strip_xml(v) for k, v in schema.items() if k != "xml"}
+    if isinstance(schema, list):
+        return [strip_xml(v) for v in schema]
+    return schema
+
+
+def describe(method: str, path: str, operation: dict, description: str = None) -> str:
+    summary = operation.get("summary", "").strip()
+    if description is None:
+        description = operation.get("description", "").strip()
+    lines = [summary] if summary else []
+    if description and description != summary.rstrip("."):
+        lines.append(description)
+    lines.append(f"Path: {method.upper()} {path}, operationId: {operation['operationId']}")
+    return "\n".join(lines)
+
+
+ARGUMENT_LINE = re.compile(r"^(\s*)(\w+) \(([^)]*)\):\s*(.*)$")
+
+
+def argument_docs(docstring: str) -> dict:
+    """
+    Map argument name -> (docstring line, description text) from a
+    'name (type): text' Parameters section, joining indented continuation lines.
+    """
+    docs = {}
+    name, indent, lines = None, 0, []
+    for raw in (docstring or "").splitlines() + [""]:
+        match = ARGUMENT_LINE.match(raw)
+        continues = name is not None and raw.strip() and len(raw) - len(raw.lstrip()) > indent
+        if continues and not match:
+            lines.append(raw.strip())
+            continue
+        if name is not None:
+            docs[name] = lines
+            name = None
+        if match:
+            indent, name = len(match.group(1)), match.group(2)
+            lines = [f"{name} ({match.group(3)}): {match.group(4)}"]
+
+    return {
+        name: ("  " + "\n    ".join(lines), " ".join(lines).split("): ", 1)[1])
+        for name, lines in docs.items()
+    }
+
+
+def same_type(derived: dict, spec_schema: dict) -> bool:
+    """True if the argument's own schema accepts exactly the spec's JSON type."""
+    return "anyOf" not in derived and derived.get("type") == spec_schema.get("type")
+
+
+def merge_argument(derived: dict, spec_schema: dict, description: str = None, doc: str = None) -> dict:
+    if not same_type(derived, spec_schema):
+        prop = dict(derived)
+        if doc or description:
+            prop["description"] = doc or description
+        return prop
+
+    prop = strip_xml(spec_schema)
+    # the docstring says what this tool does with the argument (defaults, accepted values),
+    # so it is kept unless the spec already says the same
+    texts = [text for text in (description, doc) if text]
+    if len(texts) == 2 and texts[1].rstrip(".") in texts[0]:
+        texts.pop()
+    if texts:
+        prop["description"] = "\n".join(texts)
+    if "default" in derived:
+        prop["default"] = derived["default"]
+    return prop
+
+
+def build_catalog(spec: dict, tools: list) -> list:
+    """
+    Merge FastMCP tool definitions with a resolved OpenAPI spec.
+
+    Parameters:
+        spec (dict): Spec with $refs resolved (prance ResolvingParser.specification).
+        tools (list): mcp.types.Tool objects as returned by FastMCP.list_tools().
+
+    Returns:
+        list: JSON-ready tool definitions.
+    """
+    operations = operations_by_id(spec)
+    catalog = []
+
+    for tool in tools:
+        entry = tool.model_dump(by_alias=True, exclude_none=True)
+        if tool.name not in TOOL_OPERATIONS:
+            catalog.append(entry)
+            continue
+
+        operation_id, body_arg = TOOL_OPERATIONS[tool.name]
+        method, path, operation = operations[operation_id]
+        docs = argument_docs(tool.description)
+
+        schema = copy.deepcopy(entry["inputSchema"])
+        properties = schema.get("properties", {})
+        from_spec = set()
+
+        for parameter in operation.get("parameters", []):
+            name = parameter.get("name")
+            if name not in properties:
+                continue
+            doc = docs.get(name, (None, None))[1]
+            properties[name] = merge_argument(
+                properties[name], parameter.get("schema", {}), parameter.get("description"), doc
+            )
+            if same_type(entry["inputSchema"]["properties"][name], parameter.get("schema", {})):
+                from_spec.add(name)
+
+        request_body = operation.get("requestBody")
+        if body_arg in properties and request_body:
+            content = request_body.get("content", {})
+            media = content.get("application/json") or next(iter(content.values()))
+            body_schema = media.get("schema", {})
+            doc = docs.get(body_arg, (None, None))[1]
+            properties[body_arg] = merge_argument(
+                properties[body_arg], body_schema, request_body.get("description"), doc
+            )
+            if same_type(entry["inputSchema"]["properties"][body_arg], body_schema):
+                from_spec.add(body_arg)
+
+        # arguments the spec does not describe keep the guidance from the docstring
+        extra = [name for name in properties if name not in from_spec and name in docs]
+        for name in extra:
+            properties[name].setdefault("description", docs[name][1])
+
+        description = describe(method, path, operation, DESCRIPTION_OVERRIDES.get(tool.name))
+        if extra:
+            description += "\nParameters:\n" + "\n".join(docs[name][0] for name in extra)
+        entry["description"] = description
+        entry["inputSchema"] = schema
+        catalog.append(entry)
+
+    return catalog
+
+
+def source_hash(tools: list, spec_path: str = SPEC_PATH) -> str:
+    """
+    Hash of what the catalogue is built from: the spec file and, per tool, the
+    name, docstring and schemas FastMCP derives from main.py.
+
+    Parameters:
+        tools (list): FastMCP tool infos (server._tool_manager.list_tools()).
+    """
+    digest = hashlib.sha256()
+    with open(spec_path, "rb") as f:
+        digest.update(f.read())
+    derived = [
+        [tool.name, tool.description, tool.parameters, tool.output_schema]
+        for tool in tools
+    ]
+    digest.update(json.dumps(derived, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+if __name__ == "__main__":
+    from prance import ResolvingParser
+
+    from main import server
+
+    spec = ResolvingParser(SPEC_PATH).specification
+    tools = asyncio.run(FastMCP.list_tools(server))
+    catalog = build_catalog(spec, tools)
+
+    with open(CATALOG_PATH, "w", encoding="utf-8") as f:
+        json.dump({"sourceHash": source_hash(server._tool_manager.list_tools()), "tools": catalog}, f, indent=2)
+        f.write("\n")
+
+    print(f"Wrote {len(catalog)} tools to {CATALOG_PATH}")
@@ -0,0 +1,151 @@
+"""
+Traffic recording for the MCP tools.
+
+The log is append-only: each tool call is one msgpack map prefixed with its
+length as a 4-byte big-endian integer, so a log cut short by a crash can
+still be read up to the last complete record. Writes are buffered, and the
+buffer is flushed at most FLUSH_INTERVAL seconds after a record is written
+(even if no other call follows), so a crash loses at most that much. Record
+keys:
+
+    t        seconds since recording started, when the call arrived
+    client   recorder-local number of the client session (0 outside a session)
+    tool     tool name
+    op       operationId (tool name for tools without one)
+    args     call arguments, redacted (see below)
+    dur      seconds the call took, including time spent queued or rejected
+    size     bytes of text returned to the client
+    error    True if the call raised
+
+Arguments are redacted before they are logged: at any depth of the
+arguments (including the user objects passed to createUser, updateUser and
+create_users_with_list_input), the value of every key in SENSITIVE_KEYS is
+replaced with REDACTED. By default that covers passwords (loginUser and the
+user payloads) and the personal fields of a user: email, phone, firstName
+and lastName, and adminToken, should an admin call ever be recorded (the
+server keeps them out of the log). Pass 'sensitive_keys' to TrafficRecorder to change the set.
+Keys are matched case-insensitively. A replayed log sends REDACTED in their
+place, which is enough for load testing, since the stub tools don't check
+credentials.
+"""
+import asyncio
+import itertools
+import json
+import struct
+import time
+import weakref
+from typing import Iterator
+
+import msgpack
+
+HEADER = struct.Struct(">I")
+
+REDACTED = "[redacted]"
+SENSITIVE_KEYS = frozenset({"password", "email", "phone", "firstname", "lastname", "admintoken"})
+
+
+def redact(value, sensitive_keys=SENSITIVE_KEYS):
+    """Copy of 'value' with the values of sensitive keys replaced, at any depth."""
+    if isinstance(value, dict):
+        return {
+            k: REDACTED if isinstance(k, str) and k.lower() in sensitive_keys else redact(v, sensitive_keys)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(v, sensitive_keys) for v in value]
+    return value
+
+
+def result_size(result) -> int:
+    """Bytes of text a call_tool result puts on the wire."""
+    if isinstance(result, dict):
+        return len(json.dumps(result, indent=2).encode())
+    size = 0
+    for block in result or ():
+        text = getattr(block, "text", None)
+        if text is not None:
+            size += len(text.encode())
+    return size
+
+
+class TrafficRecorder:
+    """Appends one record per tool call to a log file opened in append mode."""
+
+    # a record reaches the file at most this many seconds after it is written
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, path: str, sensitive_keys=SENSITIVE_KEYS):
+        self.path = path
+        self.sensitive_keys = frozenset(k.lower() for k in sensitive_keys)
+        self._file = open(path, "ab")
+        self._start = time.monotonic()
+        self._flush_timer = None
+        self._flush_loop = None
+        self._clients = weakref.WeakKeyDictionary()
+        self._ids = itertools.count(1)
+
+    def client_id(self, session) -> int:
+        if session is None:
+            return 0
+        client = self._clients.get(session)
+        if client is None:
+            client = self._clients[session] = next(self._ids)
+        return client
+
+    async def record(self, session, name: str, operation_id: str, arguments: dict, call):
+        """Run 'call()' and log it; the result or exception is passed through unchanged."""
+        arrived = time.monotonic()
+        entry = {
+            "t": arrived - self._start,
+            "client": self.client_id(session),
+            "tool": name,
+            "op": operation_id,
+            "args": redact(arguments, self.sensitive_keys),
+        }
+        try:
+            result = await call()
+        except BaseException:
+            entry.update(dur=time.monotonic() - arrived, size=0, error=True)
+            self.write(entry)
+            raise
+
+        entry.update(dur=time.monotonic() - arrived, size=result_size(result), error=False)
+        self.write(entry)
+        return result
+
+    def write(self, entry: dict) -> None:
+        payload = msgpack.packb(entry, use_bin_type=True, default=str)
+        self._file.write(HEADER.pack(len(payload)) + payload)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # no event loop to schedule on, so don't leave the record in the buffer
+            self.flush()
+            return
+        if self._flush_timer is None or self._flush_loop is not loop:
+            self._flush_loop = loop
+            self._flush_timer = loop.call_later(self.FLUSH_INTERVAL, self.flush)
+
+    def flush(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        self._file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+
+def read_log(path: str) -> Iterator[dict]:
+    """Yield the records of a traffic log, stopping at a truncated tail."""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return
+            (length,) = HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield msgpack.unpackb(payload, raw=False)